@@ -3,22 +3,54 @@
 # --- START imports and globals ---
 import argparse
 import logging
-import re
+import os
+import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import BinaryIO
 
-from .plugins import FileInfoHandlerFunction, find_all_functions
+from .plugins import FileInfo, find_all_functions, get_suffix
+from .processor import process_all_files
 
 LOG = logging.getLogger(__name__)
 # --- END imports and globals ---
 
 
 # --- START CLI ---
+def _positive_int(value: str) -> int:
+    """Argument type for a whole number that is at least 1.
+
+    Args:
+        value: Command line value to convert.
+
+    Returns:
+        The value as an int.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive integer.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a positive integer")
+    return number
+
+
 def _get_command_line() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Get information on files.")
 
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose output."
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=_positive_int,
+        metavar="N",
+        help="Process files in N worker processes, for CPU-bound plugins.",
+    )
     parser.add_argument("path", nargs="+", type=Path, help="Paths to search.")
 
     return parser.parse_args()
@@ -28,73 +60,202 @@ def _get_command_line() -> argparse.Namespace:
 
 
 # --- START Iterate paths ---
-def find_all_files(paths: list[Path]) -> list[Path]:
-    """Find all of the file paths in a set of paths.
+def _scan(
+    path: str | os.PathLike,
+    suffixes: frozenset[str] | None = None,
+) -> Iterator[FileInfo]:
+    """Yield the files beneath a directory, and all of its subdirectories.
+
+    Uses the cached type information on each `os.DirEntry`, so only files that
+    survive the walk are turned into `Path` objects, and each file is only
+    `stat`ed once. Symlinked directories are not followed, so a link cycle
+    cannot make the walk run forever.
+
+    This is used instead of `Path.rglob("*")` on every Python version. Before
+    3.12, `rglob` de-duplicates its results in a way that slows down badly on
+    large, deeply nested trees, and it yields directories as well as files.
+
+    Args:
+        path: Directory to walk.
+        suffixes: If given, only files with one of these suffixes are yielded.
+
+    Yields:
+        Information on the files found.
+    """
+    # Directories still to walk are kept on a list rather than by recursing,
+    # so a very deep tree can't run out of stack.
+    stack = [path]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif suffixes is not None and (
+                        get_suffix(entry.name) not in suffixes
+                    ):
+                        continue
+                    elif entry.is_file():
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            LOG.debug(
+                                "Skipping %s", entry.path, exc_info=True
+                            )
+                        else:
+                            # Use the normalised path (./a becomes a), so the
+                            # same file found another way compares equal.
+                            file_path = Path(entry.path)
+                            yield FileInfo(file_path, stat, str(file_path))
+        except OSError:
+            LOG.debug("Skipping %s due to error", directory, exc_info=True)
+
+
+def _roots_overlap(paths: list[Path]) -> bool:
+    """Check whether any of the given paths is the same as, or inside, another.
+
+    Args:
+        paths: List of paths to check.
+
+    Returns:
+        True if the same file could be found through more than one path, and
+        False otherwise.
+    """
+    resolved = [path.resolve() for path in paths]
+    roots = set(resolved)
+    # Checking each path's parents against the set keeps this linear in the
+    # number of paths, rather than comparing every path with every other.
+    return len(roots) != len(resolved) or any(
+        parent in roots for path in resolved for parent in path.parents
+    )
+
+
+def _path_order(info: FileInfo) -> list[str]:
+    """Sort key that orders files the same way as their `Path` objects.
+
+    Args:
+        info: Information on the file.
+
+    Returns:
+        Parts of the file's path, normalised for case as `Path` does.
+    """
+    return os.path.normcase(info.fspath).split(os.sep)
+
+
+def find_all_files(
+    paths: list[Path],
+    suffixes: frozenset[str] | None = None,
+) -> list[FileInfo]:
+    """Find all of the files in a set of paths.
 
     Args:
         paths: List of paths to include.
+        suffixes: If given, files in directories are skipped unless they have
+            one of these suffixes. Paths to files are always included.
 
     Returns:
-        Sorted list of paths.
+        Information on each file, sorted by path.
     """
-    file_paths = set()
+    files = []
     for path in paths:
         if path.is_file():
-            file_paths.add(path)
+            files.append(FileInfo.from_path(path))
         else:
-            for child in path.rglob("*"):
-                if child.is_file():
-                    file_paths.add(child)
-    return sorted(file_paths)
+            files.extend(_scan(path, suffixes))
+
+    # Only pay for de-duplication if the paths could have found the same file.
+    if _roots_overlap(paths):
+        files = {os.path.normcase(info.fspath): info for info in files}.values()
+    return sorted(files, key=_path_order)
 
 
 # --- END Iterate paths ---
 
 
-# --- START File processor ---
-def process_file(
-    path: Path,
-    processor_functions: list[tuple[str, FileInfoHandlerFunction]],
-):
-    """Process a single file path.
+# --- START Logging ---
+class _BufferedStreamHandler(logging.StreamHandler):
+    """Stream handler that leaves flushing to the stream's buffer.
 
-    Args:
-        path: Path of the file.
-        processor_functions: List of 2-element tuples, containing a file
-            extension regular expression, and a corresponding function.
+    StreamHandler flushes after every record, which costs a write for every line
+    of output. This only flushes for errors, and when logging is shut down.
     """
-    LOG.debug("--> Processing file %s (%r)", path, path.suffix)
-    for pattern, processor in processor_functions:
-        if not re.match(pattern, path.suffix):
-            continue
 
-        LOG.debug("==> Calling %s", processor)
+    def emit(self, record: logging.LogRecord):
         try:
-            LOG.info("\n".join(map(str, processor(path))))
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
         except Exception:
-            LOG.debug(
-                "ERROR running %s on %s",
-                processor,
-                path,
-                exc_info=True,
-            )
+            self.handleError(record)
 
-    LOG.debug("<-- Finished %s", path)
-    LOG.info("")
 
+def _setup_logging(verbose: bool):
+    """Set up logging to write to stderr through a 64 KiB buffer.
 
-# --- END File processor ---
-
-# --- START main ---
-if __name__ == "__main__":
-    args = _get_command_line()
+    Args:
+        verbose: Whether to enable verbose output.
+    """
+    stream = open(
+        sys.stderr.fileno(),
+        mode="w",
+        buffering=1 << 16,
+        encoding=sys.stderr.encoding,
+        errors=sys.stderr.errors,
+        closefd=False,
+    )
     logging.basicConfig(
-        level=logging.DEBUG if args.verbose else logging.INFO,
+        level=logging.DEBUG if verbose else logging.INFO,
         format="%(message)s",
+        handlers=[_BufferedStreamHandler(stream)],
     )
 
+
+# --- END Logging ---
+
+
+# --- START Output ---
+def _emit(out: BinaryIO, lines: Iterable[str], separate: bool = False):
+    """Write lines of output as UTF-8.
+
+    Args:
+        out: Buffered binary stream to write to.
+        lines: Lines of text to write.
+        separate: Whether to write a blank line first, to separate these lines
+            from the previous file's.
+    """
+    if separate:
+        out.write(b"\n")
+    out.writelines(
+        f"{line}\n".encode("utf-8", "surrogateescape") for line in lines
+    )
+
+
+# --- END Output ---
+
+
+# --- START main ---
+if __name__ == "__main__":
+    args = _get_command_line()
+    _setup_logging(args.verbose)
     processors = find_all_functions()
 
-    for path in find_all_files(args.path):
-        process_file(path, processors)
+    # Write output through a 64 KiB buffer, rather than a write for each line.
+    stdout = sys.stdout.fileno()
+    try:
+        with open(stdout, "wb", buffering=1 << 16, closefd=False) as out:
+            for i, output in enumerate(
+                process_all_files(
+                    find_all_files(args.path, processors.suffixes),
+                    processors,
+                    jobs=args.jobs,
+                    verbose=args.verbose,
+                )
+            ):
+                _emit(out, output, separate=i > 0)
+    except BrokenPipeError:
+        # Whatever we were piped to has stopped reading (like `head`), so stop
+        # quietly. Point stdout at devnull, so flushing it at exit can't fail.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, stdout)
 # --- END main ---
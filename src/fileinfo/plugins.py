@@ -1,20 +1,101 @@
 import importlib
 import inspect
 import logging
+import os
 import pkgutil
+import re
+import sys
+import threading
 from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from importlib.metadata import EntryPoint, entry_points
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, TypeVar
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+@dataclass(frozen=True, slots=True)
+class FileInfo:
+    """A file to get information on.
+
+    Attributes:
+        path: Path of the file.
+        stat: Result of stat on the file, taken when the file was found.
+        fspath: Path of the file as a string, which is cheaper to work with
+            than the Path in hot loops.
+    """
+
+    path: Path
+    stat: os.stat_result
+    fspath: str
+
+    @classmethod
+    def from_path(cls, path: Path) -> "FileInfo":
+        """Get the information for a file path.
+
+        Args:
+            path: Path of the file.
+
+        Returns:
+            Information on the file.
+        """
+        return cls(path, path.stat(), str(path))
+
+    @property
+    def suffix(self) -> str:
+        """The file extension, the same as `Path.suffix`, without a Path."""
+        return get_suffix(os.path.basename(self.fspath))
+
+
+def get_suffix(name: str) -> str:
+    """Get the extension of a file name, the same way as `Path.suffix`.
+
+    Args:
+        name: Name of the file.
+
+    Returns:
+        The file extension, or an empty string if there isn't one.
+    """
+    i = name.rfind(".")
+    return name[i:] if 0 < i < len(name) - 1 else ""
+
+
 # This is the signature of a function that could be decorated.
-FileInfoHandlerFunction = Callable[[Path], Iterable[str]]
+FileInfoHandlerFunction = Callable[[FileInfo], Iterable[str]]
 # This is a TypeVar to indicate that we get out what we put in.
 F = TypeVar("F", bound=FileInfoHandlerFunction)
 
 
+# Compiled patterns, shared by every function registered to the same pattern.
+_PATTERN_CACHE: dict[str, re.Pattern] = {}
+
+
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a type pattern, reusing it if it has been compiled before.
+
+    Args:
+        pattern: Regex pattern of the file extension to match.
+
+    Returns:
+        The compiled pattern.
+    """
+    if (compiled := _PATTERN_CACHE.get(pattern)) is None:
+        compiled = _PATTERN_CACHE.setdefault(pattern, re.compile(pattern))
+    return compiled
+
+
 # --- START Decorator ---
 LOG = logging.getLogger(__name__)
 ATTR_NAME = "_fileinfo_registered_type"
+MODULE_ATTR_NAME = "_fileinfo_handlers"
+COMPILED_ATTR_NAME = "_fileinfo_compiled_types"
 
 
 def file_type(*patterns: str) -> Callable[[F], F]:
@@ -31,15 +112,21 @@ def file_type(*patterns: str) -> Callable[[F], F]:
     def wrapper(func: F) -> F:
         """Wraps a callable to mark it for a given type."""
         LOG.debug("Registering %s to %s", func, patterns)
+        compiled = {pattern: _compile_pattern(pattern) for pattern in patterns}
         if isinstance(
             (registered_types := getattr(func, ATTR_NAME, None)),
             set,
         ):
             LOG.debug("Adding to existing set")
             registered_types.update(patterns)
+            getattr(func, COMPILED_ATTR_NAME, {}).update(compiled)
         else:
             LOG.debug("Creating new set")
             setattr(func, ATTR_NAME, {*patterns})
+            setattr(func, COMPILED_ATTR_NAME, compiled)
+            # Also list it in its module, so finding it doesn't need a search.
+            if (module := sys.modules.get(func.__module__)) is not None:
+                vars(module).setdefault(MODULE_ATTR_NAME, []).append(func)
 
         return func
 
@@ -70,14 +157,15 @@ def _is_plugin_func(obj: Any) -> bool:
 # --- START Function Finder ---
 def _find_functions_in_module(
     module_name: str,
-) -> list[tuple[str, FileInfoHandlerFunction]]:
+) -> list[tuple[re.Pattern, FileInfoHandlerFunction]]:
     """Find all of the functions within a given module by name.
 
     Args:
         module_name: Name of the module to import.
 
     Returns:
-        List of matching functions.
+        List of tuples, containing the compiled type patterns and their
+        associated functions.
     """
     found_handlers = []
     LOG.debug("Importing %s", module_name)
@@ -86,10 +174,18 @@ def _find_functions_in_module(
     except Exception:
         LOG.debug("Skipping %s due to import error", module_name)
     else:
-        for _, func in inspect.getmembers(module, _is_plugin_func):
+        # The decorator lists the functions in their module, in the order
+        # they were defined, so there's no need to search the whole module.
+        for func in filter(
+            _is_plugin_func, getattr(module, MODULE_ATTR_NAME, ())
+        ):
+            compiled = getattr(func, COMPILED_ATTR_NAME, {})
             for type_pattern in getattr(func, ATTR_NAME):
                 LOG.debug("Adding %r for %s", type_pattern, func)
-                found_handlers.append((type_pattern, func))
+                pattern = compiled.get(type_pattern)
+                if pattern is None:
+                    pattern = _compile_pattern(type_pattern)
+                found_handlers.append((pattern, func))
 
     return found_handlers
 
@@ -97,13 +193,226 @@ def _find_functions_in_module(
 # --- END Function Finder ---
 
 
+# --- START Entry Point Finder ---
+ENTRY_POINT_GROUP = "fileinfo.plugins"
+
+
+class _EntryPointHandler:
+    """Handler function from an entry point, only imported when it is called.
+
+    Args:
+        entry_point: Entry point naming the handler function.
+    """
+
+    def __init__(self, entry_point: EntryPoint):
+        self.entry_point = entry_point
+
+    def __repr__(self) -> str:
+        return f"<entry point {self.entry_point.value}>"
+
+    @cached_property
+    def function(self) -> FileInfoHandlerFunction:
+        """The handler function, imported the first time it is needed."""
+        LOG.debug("Loading %s", self.entry_point.value)
+        return self.entry_point.load()
+
+    def __call__(self, info: FileInfo) -> Iterable[str]:
+        return self.function(info)
+
+
+def _find_entry_point_functions() -> (
+    list[tuple[re.Pattern, FileInfoHandlerFunction]]
+):
+    """Find the functions that installed packages declare as entry points.
+
+    The name of each entry point in the group is the file extension that it
+    handles, without the leading period, such as `csv = "my_plugin:handle"`.
+    This means the module doesn't need to be imported to know when to call it.
+
+    Returns:
+        List of tuples, containing the compiled type patterns and their
+        associated functions.
+    """
+    found_handlers = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        pattern = _compile_pattern(re.escape(f".{entry_point.name}"))
+        LOG.debug("Adding %r for %s", pattern.pattern, entry_point.value)
+        found_handlers.append((pattern, _EntryPointHandler(entry_point)))
+
+    return found_handlers
+
+
+# --- END Entry Point Finder ---
+
+
+# --- START Handler registry ---
+HYPERSCAN_MIN_PATTERNS = 8
+
+
+def _literal_suffix(pattern: str) -> str | None:
+    """Get the plain suffix that a pattern matches, if it is just a literal.
+
+    Args:
+        pattern: Regex pattern of the file extension to match.
+
+    Returns:
+        The unescaped suffix if the pattern has no special characters other
+        than escapes, and is a period followed by at least one character, and
+        None otherwise. Patterns such as `""`, which `re.match` finds at the
+        start of every suffix, are left as regexes.
+    """
+    literal = re.sub(r"\\(.)", r"\1", pattern)
+    if len(literal) < 2 or not literal.startswith("."):
+        return None
+    return literal if re.escape(literal) == pattern else None
+
+
+def _compile_hyperscan(patterns: list[re.Pattern]) -> Any:
+    """Compile regex patterns into a single Hyperscan database.
+
+    Matching one database is cheaper than matching many patterns one at a time,
+    but only once there are enough patterns to make up for calling into it.
+
+    Args:
+        patterns: Compiled regex patterns of the file extensions to match.
+
+    Returns:
+        Hyperscan database where the ID of each expression is its index in
+        patterns, or None if Hyperscan isn't installed, there are too few
+        patterns, or it does not support them.
+    """
+    if hyperscan is None or len(patterns) < HYPERSCAN_MIN_PATTERNS:
+        return None
+    if not all(p.pattern.isascii() and not p.flags & ~re.U for p in patterns):
+        return None
+
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    try:
+        database.compile(
+            # Anchor each pattern to the start of the suffix, like re.match.
+            expressions=[f"^(?:{p.pattern})".encode() for p in patterns],
+            ids=list(range(len(patterns))),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY]
+            * len(patterns),
+        )
+    except hyperscan.error:
+        LOG.debug("Patterns not supported by Hyperscan", exc_info=True)
+        return None
+
+    return database
+
+
+@dataclass
+class HandlerRegistry:
+    """Handler functions, bucketed by how their type patterns are matched.
+
+    Patterns that are just an escaped suffix are looked up in a dict, and only
+    genuine regular expressions are matched against each suffix. A literal
+    pattern must match the whole suffix, so a ".csv" plugin does not also get
+    ".csvx" files. If Hyperscan is installed and there are enough regular
+    expressions, they are all matched at once by a single Hyperscan database.
+
+    Attributes:
+        literal: Registration order and function for each literal suffix.
+        patterns: Registration order, compiled regex and function for every
+            other pattern.
+    """
+
+    literal: dict[str, list[tuple[int, FileInfoHandlerFunction]]] = field(
+        default_factory=dict
+    )
+    patterns: list[tuple[int, re.Pattern, FileInfoHandlerFunction]] = field(
+        default_factory=list
+    )
+    # Hyperscan database for the patterns, False if there isn't one, or None
+    # if it needs compiling. A database can only scan one suffix at a time.
+    _database: Any = field(default=None, init=False, repr=False)
+    _database_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    @property
+    def suffixes(self) -> frozenset[str] | None:
+        """The only file suffixes that any function handles.
+
+        This is None if there are regex patterns, since then any suffix could
+        be handled.
+        """
+        return None if self.patterns else frozenset(self.literal)
+
+    def __len__(self) -> int:
+        return len(self.patterns) + sum(map(len, self.literal.values()))
+
+    def add(self, pattern: re.Pattern, func: FileInfoHandlerFunction):
+        """Register a function to a compiled type pattern.
+
+        Args:
+            pattern: Compiled regex pattern of the file extension to match.
+            func: Function to call for matching files.
+        """
+        order = len(self)
+        if (suffix := _literal_suffix(pattern.pattern)) is not None:
+            self.literal.setdefault(suffix, []).append((order, func))
+        else:
+            self.patterns.append((order, pattern, func))
+            self._database = None
+
+    def _match_patterns(
+        self,
+        suffix: str,
+    ) -> list[tuple[int, FileInfoHandlerFunction]]:
+        """Match a file suffix against the regex patterns.
+
+        Args:
+            suffix: File suffix, such as ".csv".
+
+        Returns:
+            Registration order and function for each matching pattern.
+        """
+        if self._database is None:
+            compiled = [p for _, p, _ in self.patterns]
+            self._database = _compile_hyperscan(compiled) or False
+
+        if self._database and suffix.isascii():
+            ids = []
+            with self._database_lock:
+                self._database.scan(
+                    suffix.encode(),
+                    match_event_handler=lambda id, *_: ids.append(id),
+                )
+            return [self.patterns[i][::2] for i in sorted(ids)]
+
+        return [(o, f) for o, p, f in self.patterns if p.match(suffix)]
+
+    def for_suffix(self, suffix: str) -> list[FileInfoHandlerFunction]:
+        """Get the functions that handle a file suffix.
+
+        Args:
+            suffix: File suffix, such as ".csv".
+
+        Returns:
+            Matching functions, in the order they were registered.
+        """
+        literal = self.literal.get(suffix, ())
+        matches = self._match_patterns(suffix)
+        # Each bucket is already in order, so only merge if both matched.
+        if literal and matches:
+            matches = sorted([*literal, *matches], key=itemgetter(0))
+        return [func for _, func in matches or literal]
+
+
+# --- END Handler registry ---
+
+
 # --- START Plugin Finder ---
-def find_all_functions() -> list[tuple[str, FileInfoHandlerFunction]]:
+IMPORT_WORKERS = 8
+
+
+def find_all_functions() -> HandlerRegistry:
     """Find all functions that can be registered to a type.
 
     Returns:
-        List of tuples, containing the type patterns and their associated
-        functions.
+        Registry of the type patterns and their associated functions.
     """
     found_handlers = []
     LOG.debug("--> Finding handler plugins")
@@ -111,7 +420,16 @@ def find_all_functions() -> list[tuple[str, FileInfoHandlerFunction]]:
     # Add the default behavior
     found_handlers += _find_functions_in_module(__name__)
 
-    # Search all top-level packages/modules
+    # Add the entry points, which are imported later, when they are needed
+    entry_point_handlers = _find_entry_point_functions()
+    found_handlers += entry_point_handlers
+    entry_point_names = {
+        (func.entry_point.module, func.entry_point.attr)
+        for _, func in entry_point_handlers
+    }
+
+    # Search all top-level packages/modules for names of plugin modules
+    module_names = []
     for _, module_name, is_pkg in pkgutil.iter_modules():
         # If it doesn't start with fileinfo and end with plugin, skip it!
         if not all(
@@ -133,14 +451,31 @@ def find_all_functions() -> list[tuple[str, FileInfoHandlerFunction]]:
                     "Skipping %s due to error", module_name, exc_info=True
                 )
             else:
-                for _, module_name, _ in pkgutil.walk_packages(module.__path__):
-                    found_handlers += _find_functions_in_module(module_name)
+                for _, module_name, _ in pkgutil.walk_packages(
+                    module.__path__, prefix=f"{module_name}."
+                ):
+                    module_names.append(module_name)
 
         else:
-            found_handlers += _find_functions_in_module(module_name)
+            module_names.append(module_name)
+
+    # Import them in parallel, since much of importing is waiting on the disk.
+    # The import system locks each module, so none are imported twice.
+    with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as executor:
+        for handlers in executor.map(_find_functions_in_module, module_names):
+            for pattern, func in handlers:
+                # If it has an entry point, it is already registered!
+                name = (func.__module__, func.__qualname__)
+                if name in entry_point_names:
+                    LOG.debug("Skipping %s, found by entry point", func)
+                    continue
+                found_handlers.append((pattern, func))
 
     LOG.debug("<-- Found %d handler functions", len(found_handlers))
-    return found_handlers
+    registry = HandlerRegistry()
+    for pattern, func in found_handlers:
+        registry.add(pattern, func)
+    return registry
 
 
 # --- END Plugin Finder ---
@@ -148,18 +483,22 @@ def find_all_functions() -> list[tuple[str, FileInfoHandlerFunction]]:
 
 # --- START Default handler ---
 @file_type(".*")
-def default(path: Path) -> Iterable[str]:
+def default(info: FileInfo) -> Iterable[str]:
     """Default handler for any file type.
 
+    The absolute path is made with `os.path.abspath`, so symlinks in it are
+    shown as they are, rather than resolved to their targets.
+
     Args:
-        path: Path to examine.
+        info: Information on the file to examine.
 
     Returns:
         Information on the file as lines of text.
     """
-    yield f"{path.resolve()}"
-    yield f"{path.suffix.upper()} file" if path.suffix else "File"
-    yield f"{path.stat().st_size} bytes"
+    suffix = info.suffix
+    yield os.path.abspath(info.fspath)
+    yield f"{suffix.upper()} file" if suffix else "File"
+    yield f"{info.stat.st_size} bytes"
 
 
 # --- END Default handler ---
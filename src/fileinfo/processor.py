@@ -0,0 +1,142 @@
+"""Processing files against the handler functions."""
+
+import logging
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from .plugins import FileInfo, HandlerRegistry, find_all_functions
+
+LOG = logging.getLogger(__name__)
+
+
+# --- START File processor ---
+def process_file(
+    info: FileInfo,
+    processor_functions: HandlerRegistry,
+) -> list[str]:
+    """Process a single file.
+
+    The output is returned rather than written, so files can be processed in
+    parallel and still be reported in order.
+
+    Args:
+        info: Information on the file.
+        processor_functions: Registry of file extension patterns and their
+            corresponding functions.
+
+    Returns:
+        Lines of output from the matching functions.
+    """
+    output = []
+    # Checked once, so the debug messages' arguments aren't built for nothing.
+    debug = LOG.isEnabledFor(logging.DEBUG)
+    path = info.fspath
+    suffix = info.suffix
+    if debug:
+        LOG.debug("--> Processing file %s (%r)", path, suffix)
+
+    if not (processors := processor_functions.for_suffix(suffix)):
+        return output
+
+    for processor in processors:
+        if debug:
+            LOG.debug("==> Calling %s", processor)
+        try:
+            # Collected first, so a function that fails part way adds nothing.
+            output.extend([str(line) for line in processor(info)])
+        except Exception:
+            LOG.debug(
+                "ERROR running %s on %s",
+                processor,
+                path,
+                exc_info=True,
+            )
+
+    if debug:
+        LOG.debug("<-- Finished %s", path)
+    return output
+
+
+# --- END File processor ---
+
+
+# --- START Process all files ---
+# Handler registry for this worker process, set up by _init_worker.
+_worker_processors: HandlerRegistry | None = None
+
+
+def _init_worker(verbose: bool):
+    """Set up a worker process to process files.
+
+    The plugins are discovered once per worker, rather than pickling the
+    registry for every file.
+
+    Args:
+        verbose: Whether to enable verbose output.
+    """
+    global _worker_processors
+    # Replace any inherited (buffered) handlers, since a worker process exits
+    # without running logging's shutdown flush.
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(message)s",
+        force=True,
+    )
+    _worker_processors = find_all_functions()
+
+
+def _process_one(info: FileInfo) -> list[str]:
+    """Process a single file in a worker process.
+
+    Args:
+        info: Information on the file.
+
+    Returns:
+        Lines of output from the matching functions.
+    """
+    return process_file(info, _worker_processors)
+
+
+def process_all_files(
+    files: list[FileInfo],
+    processor_functions: HandlerRegistry,
+    jobs: int | None = None,
+    verbose: bool = False,
+) -> Iterator[list[str]]:
+    """Process files in parallel.
+
+    Files are processed in a thread pool, which overlaps their disk I/O. If a
+    number of jobs is given, they are instead processed in that many worker
+    processes, so that CPU-bound plugins are not limited by the GIL.
+
+    Args:
+        files: List of files to process.
+        processor_functions: Registry of file extension patterns and their
+            corresponding functions. Worker processes find their own.
+        jobs: Number of worker processes to use, or None to use threads.
+        verbose: Whether to enable verbose output in the worker processes.
+
+    Yields:
+        Lines of output for each file, in the same order as the files.
+    """
+    if jobs:
+        # Forked workers inherit any buffered log output, so write it first.
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(verbose,),
+        ) as executor:
+            yield from executor.map(_process_one, files, chunksize=32)
+    else:
+        with ThreadPoolExecutor() as executor:
+            yield from executor.map(
+                partial(process_file, processor_functions=processor_functions),
+                files,
+            )
+
+
+# --- END Process all files ---
@@ -3,26 +3,29 @@
 
 from collections.abc import Iterable
 from csv import reader
-from pathlib import Path
 
-from fileinfo.plugins import file_type
+from fileinfo.plugins import FileInfo, file_type
 
 
 @file_type(r"\.csv")
-def process_csv(path: Path) -> Iterable[str]:
+def process_csv(info: FileInfo) -> Iterable[str]:
     """Process a CSV file.
 
     Args:
-        path: Path of the file to check.
+        info: Information on the file to check.
 
     Yields:
         Information on columns and rows.
     """
-    with path.open(mode="r") as f:
-        contents = list(reader(f))
-
-    yield f"Rows {len(contents)}"
-    yield f"Columns {max(len(r) for r in contents)}"
+    rows = 0
+    columns = 0
+    with info.path.open(mode="r", buffering=1 << 20, newline="") as f:
+        for row in reader(f):
+            rows += 1
+            columns = max(columns, len(row))
+
+    yield f"Rows {rows}"
+    yield f"Columns {columns}"
 
 
 # --- END fileinfo_csv_plugin ---
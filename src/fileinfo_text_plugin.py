@@ -1,25 +1,114 @@
 # --- START fileinfo_text_plugin ---
 """Plugin for fileinfo for TXT files."""
 
-from collections.abc import Iterable
-from pathlib import Path
+import mmap
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
 
-from fileinfo.plugins import file_type
+from fileinfo.plugins import FileInfo, file_type
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK_SIZE = 1 << 20
+MMAP_MIN_SIZE = 16 << 20
+WHITESPACE = b" \t\n\r\x0b\x0c"
+
+if np is not None:
+    # Lookup table of whether each byte value is whitespace.
+    IS_WHITESPACE = np.zeros(256, dtype=bool)
+    IS_WHITESPACE[np.frombuffer(WHITESPACE, dtype=np.uint8)] = True
+
+
+def _chunks(f: BinaryIO, size: int) -> Iterator[bytes | memoryview]:
+    """Get the contents of a file a chunk at a time.
+
+    Files of at least `MMAP_MIN_SIZE` bytes are mapped into memory if they can
+    be, so that the chunks are views of the OS's page cache rather than copies
+    of it. The chunks must not be kept once the next one is requested.
+
+    If a mapped file is truncated by another process while it is being read,
+    touching the missing pages raises SIGBUS, which kills the whole process
+    rather than raising an exception. Smaller files are read instead, so only
+    large files carry that risk, in exchange for not copying them.
+
+    Args:
+        f: File opened for reading in binary mode.
+        size: Size of the file, in bytes, when it was found.
+
+    Yields:
+        Chunks of the file, none of which are empty.
+    """
+    mapped = None
+    if size >= MMAP_MIN_SIZE:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Some special files can't be mapped, so read them instead.
+            pass
+
+    if mapped is None:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+        return
+
+    with mapped, memoryview(mapped) as view:
+        for start in range(0, len(view), CHUNK_SIZE):
+            with view[start : start + CHUNK_SIZE] as chunk:
+                yield chunk
+
+
+def _count_chunk(chunk: bytes | memoryview, in_word: bool) -> tuple[int, int]:
+    """Count the newlines, and the words that start, in a chunk of a file.
+
+    Uses NumPy to scan the chunk in place if it is installed, and bytes.count
+    and bytes.split otherwise.
+
+    Args:
+        chunk: Chunk of the file, which must not be empty.
+        in_word: Whether the previous chunk ended in the middle of a word.
+
+    Returns:
+        Number of newlines, and number of words that start in this chunk.
+    """
+    if np is not None:
+        data = np.frombuffer(chunk, dtype=np.uint8)
+        is_ws = IS_WHITESPACE[data]
+        newlines = int(np.count_nonzero(data == ord("\n")))
+        # A word starts at each non-whitespace byte that follows whitespace.
+        words = int(np.count_nonzero(is_ws[:-1] & ~is_ws[1:]))
+        return newlines, words + (not in_word and not is_ws[0])
+
+    chunk = bytes(chunk)
+    # A word split across two chunks is counted in both of them.
+    words = len(chunk.split()) - (in_word and chunk[0] not in WHITESPACE)
+    return chunk.count(b"\n"), words
 
 
 @file_type(r"\.txt")
-def process_txt(path: Path) -> Iterable[str]:
+def process_txt(info: FileInfo) -> Iterable[str]:
     """Process a TXT file.
 
     Args:
-        path: Path of the file to check.
+        info: Information on the file to check.
 
     Yields:
         Information on number of lines and number of words.
     """
-    contents = path.read_text()
-    yield f"Lines {len(contents.split('\n'))}"
-    yield f"Words {len(contents.split())}"
+    lines = 1
+    words = 0
+    in_word = False
+    with info.path.open(mode="rb") as f:
+        for chunk in _chunks(f, info.stat.st_size):
+            newlines, chunk_words = _count_chunk(chunk, in_word)
+            lines += newlines
+            words += chunk_words
+            in_word = chunk[-1] not in WHITESPACE
+
+    yield f"Lines {lines}"
+    yield f"Words {words}"
 
 
 # --- END fileinfo_text_plugin ---